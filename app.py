@@ -1,14 +1,20 @@
 import streamlit as st
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import pandas as pd
 from datetime import datetime, timedelta
 
-from data_fetcher import get_all_assets_data, STOCK_TICKERS, CRYPTO_IDS
-from technical_indicators import (calculate_internal_bar_strength,
-                                  add_all_indicators)
+from data_fetcher import (clamp_days, STOCK_TICKERS, CRYPTO_IDS, INTERVALS,
+                          CRYPTO_INTERVALS)
+from market_snapshot import get_market_snapshot
 from web_scraper import scrape_financial_news, track_keywords_frequency, get_market_keywords
 from openai_helper import generate_market_summary, is_api_key_configured
+from correlation import get_correlation_data, DEFAULT_WINDOWS
+from screener import get_screener_signals, get_rule_signals, SCREENER_RULES
+from charts import build_price_chart
+from snapshot_store import load_latest_snapshot
+from perf_monitor import (render_chart, get_stage_stats, get_cache_stats,
+                          get_upstream_stats, render_prometheus,
+                          write_metrics_file)
 
 st.set_page_config(page_title="Financial Markets Dashboard",
                    page_icon="📈",
@@ -36,9 +42,21 @@ with st.sidebar:
     st.markdown("- Bitcoin")
     st.markdown("- Ethereum")
 
-tab1, tab2, tab3, tab4, tab5 = st.tabs([
+    st.markdown("---")
+    show_perf_panel = st.checkbox("Show Performance Panel", value=False)
+
+with st.spinner("Loading market data..."):
+    market = get_market_snapshot()
+
+if market:
+    st.sidebar.caption(
+        f"Market data version {market.version}, fetched {market.created_at:%H:%M:%S}"
+    )
+
+tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
     "📊 Internal Bar Strength", "📈 Volume Analysis", "💹 Interactive Charts",
-    "📰 News & AI Summary", "🔍 Keyword Tracker"
+    "📰 News & AI Summary", "🔍 Keyword Tracker", "🔗 Correlations",
+    "🚨 Screener"
 ])
 
 with tab1:
@@ -47,8 +65,7 @@ with tab1:
         "*Measures where the closing price falls within the day's range. Positive values indicate strength (close near high), negative values indicate weakness (close near low).*"
     )
 
-    with st.spinner("Loading market data..."):
-        data_30d = get_all_assets_data(days=30)
+    data_30d = market.window(30) if market else {}
 
     if data_30d:
         colors = {
@@ -65,7 +82,7 @@ with tab1:
         for asset_name in indices:
             if asset_name in data_30d:
                 df = data_30d[asset_name]
-                ibs = calculate_internal_bar_strength(df)
+                ibs = df.get('IBS')
 
                 if ibs is not None:
                     avg_ibs = ibs.mean()
@@ -106,7 +123,7 @@ with tab1:
                             showlegend=False,
                             margin=dict(l=50, r=20, t=40, b=40))
 
-                        st.plotly_chart(fig, width='stretch')
+                        render_chart(fig)
 
                     with col2:
                         st.metric("Current IBS", f"{recent_ibs:.1f}%")
@@ -122,7 +139,7 @@ with tab1:
         for asset_name in cryptos:
             if asset_name in data_30d:
                 df = data_30d[asset_name]
-                ibs = calculate_internal_bar_strength(df)
+                ibs = df.get('IBS')
 
                 if ibs is not None:
                     avg_ibs = ibs.mean()
@@ -163,7 +180,7 @@ with tab1:
                             showlegend=False,
                             margin=dict(l=50, r=20, t=40, b=40))
 
-                        st.plotly_chart(fig, width='stretch')
+                        render_chart(fig)
 
                     with col2:
                         st.metric("Current IBS", f"{recent_ibs:.1f}%")
@@ -182,8 +199,7 @@ with tab2:
         "*Displays the total trading volume for each asset over the last 10 days.*"
     )
 
-    with st.spinner("Loading volume data..."):
-        data_10d = get_all_assets_data(days=10)
+    data_10d = market.window(10) if market else {}
 
     if data_10d:
         fig = go.Figure()
@@ -218,7 +234,7 @@ with tab2:
                                       xanchor="right",
                                       x=1))
 
-        st.plotly_chart(fig, width='stretch')
+        render_chart(fig)
 
         col1, col2 = st.columns(2)
 
@@ -243,7 +259,7 @@ with tab3:
         "*Customize timeframes and add technical indicators to analyze price movements.*"
     )
 
-    col1, col2 = st.columns([2, 1])
+    col1, col2, col3 = st.columns([2, 1, 1])
 
     with col1:
         selected_asset = st.selectbox(
@@ -256,6 +272,18 @@ with tab3:
             ["1 Week", "1 Month", "3 Months", "6 Months", "1 Year"],
             index=1)
 
+    # Crypto prices are at best hourly, so crypto charts only offer daily bars
+    intervals = (CRYPTO_INTERVALS
+                 if selected_asset in CRYPTO_IDS else list(INTERVALS.keys()))
+
+    with col3:
+        interval = st.selectbox("Interval", intervals, index=len(intervals) - 1)
+
+    if selected_asset in CRYPTO_IDS:
+        st.caption(
+            "Crypto charts use daily bars: CoinGecko only provides hourly prices, which can't form real intraday candles."
+        )
+
     timeframe_map = {
         "1 Week": 7,
         "1 Month": 30,
@@ -264,10 +292,14 @@ with tab3:
         "1 Year": 365
     }
 
-    days = timeframe_map[timeframe]
+    days = clamp_days(timeframe_map[timeframe], interval)
+    if days < timeframe_map[timeframe]:
+        st.info(
+            f"{interval} bars are only available for the last {days} days; showing that range."
+        )
 
     st.subheader("Technical Indicators")
-    col1, col2, col3, col4 = st.columns(4)
+    col1, col2, col3, col4, col5 = st.columns(5)
 
     with col1:
         show_sma = st.checkbox("Moving Averages", value=True)
@@ -277,160 +309,33 @@ with tab3:
         show_macd = st.checkbox("MACD", value=False)
     with col4:
         show_bb = st.checkbox("Bollinger Bands", value=False)
+    with col5:
+        # The IBS tab is daily; intraday IBS is shown here, per bar
+        show_ibs = st.checkbox("IBS", value=interval != '1d')
 
-    with st.spinner(f"Loading {selected_asset} data..."):
-        data = get_all_assets_data(days=days)
+    if interval == '1d':
+        chart_market = market
+    else:
+        with st.spinner(f"Loading {interval} data..."):
+            chart_market = get_market_snapshot(interval)
 
+    data = chart_market.window(days) if chart_market else {}
+
+    # Snapshot frames already carry every indicator; the checkboxes only
+    # choose which ones are drawn
     if data and selected_asset in data:
-        df = data[selected_asset].copy()
-
-        indicators = []
-        if show_sma:
-            indicators.append('SMA')
-        if show_rsi:
-            indicators.append('RSI')
-        if show_macd:
-            indicators.append('MACD')
-        if show_bb:
-            indicators.append('BB')
-
-        df = add_all_indicators(df, indicators=indicators)
-
-        num_subplots = 1
-        if show_rsi:
-            num_subplots += 1
-        if show_macd:
-            num_subplots += 1
-
-        subplot_titles = ["Price"]
-        if show_rsi:
-            subplot_titles.append("RSI")
-        if show_macd:
-            subplot_titles.append("MACD")
-
-        row_heights = [0.6] + [0.2] * (num_subplots -
-                                       1) if num_subplots > 1 else [1.0]
-
-        fig = make_subplots(rows=num_subplots,
-                            cols=1,
-                            shared_xaxes=True,
-                            vertical_spacing=0.05,
-                            subplot_titles=subplot_titles,
-                            row_heights=row_heights)
-
-        fig.add_trace(go.Candlestick(x=df.index,
-                                     open=df['open'],
-                                     high=df['high'],
-                                     low=df['low'],
-                                     close=df['close'],
-                                     name=selected_asset),
-                      row=1,
-                      col=1)
-
-        if show_sma:
-            if 'SMA_20' in df.columns:
-                fig.add_trace(go.Scatter(x=df.index,
-                                         y=df['SMA_20'],
-                                         mode='lines',
-                                         name='SMA 20',
-                                         line=dict(color='orange', width=1)),
-                              row=1,
-                              col=1)
-            if 'SMA_50' in df.columns:
-                fig.add_trace(go.Scatter(x=df.index,
-                                         y=df['SMA_50'],
-                                         mode='lines',
-                                         name='SMA 50',
-                                         line=dict(color='blue', width=1)),
-                              row=1,
-                              col=1)
-
-        if show_bb:
-            if all(col in df.columns
-                   for col in ['BB_High', 'BB_Mid', 'BB_Low']):
-                fig.add_trace(go.Scatter(x=df.index,
-                                         y=df['BB_High'],
-                                         mode='lines',
-                                         name='BB Upper',
-                                         line=dict(color='gray',
-                                                   width=1,
-                                                   dash='dash')),
-                              row=1,
-                              col=1)
-                fig.add_trace(go.Scatter(x=df.index,
-                                         y=df['BB_Mid'],
-                                         mode='lines',
-                                         name='BB Mid',
-                                         line=dict(color='gray', width=1)),
-                              row=1,
-                              col=1)
-                fig.add_trace(go.Scatter(x=df.index,
-                                         y=df['BB_Low'],
-                                         mode='lines',
-                                         name='BB Lower',
-                                         line=dict(color='gray',
-                                                   width=1,
-                                                   dash='dash')),
-                              row=1,
-                              col=1)
-
-        current_row = 2
-
-        if show_rsi and 'RSI' in df.columns:
-            fig.add_trace(go.Scatter(x=df.index,
-                                     y=df['RSI'],
-                                     mode='lines',
-                                     name='RSI',
-                                     line=dict(color='purple', width=2)),
-                          row=current_row,
-                          col=1)
-            fig.add_hline(y=70,
-                          line_dash="dash",
-                          line_color="red",
-                          opacity=0.5,
-                          row=current_row,
-                          col=1)
-            fig.add_hline(y=30,
-                          line_dash="dash",
-                          line_color="green",
-                          opacity=0.5,
-                          row=current_row,
-                          col=1)
-            current_row += 1
-
-        if show_macd and all(col in df.columns
-                             for col in ['MACD', 'MACD_Signal']):
-            fig.add_trace(go.Scatter(x=df.index,
-                                     y=df['MACD'],
-                                     mode='lines',
-                                     name='MACD',
-                                     line=dict(color='blue', width=2)),
-                          row=current_row,
-                          col=1)
-            fig.add_trace(go.Scatter(x=df.index,
-                                     y=df['MACD_Signal'],
-                                     mode='lines',
-                                     name='Signal',
-                                     line=dict(color='red', width=2)),
-                          row=current_row,
-                          col=1)
-            if 'MACD_Diff' in df.columns:
-                fig.add_trace(go.Bar(x=df.index,
-                                     y=df['MACD_Diff'],
-                                     name='Histogram',
-                                     marker_color='gray'),
-                              row=current_row,
-                              col=1)
-
-        fig.update_layout(title=f"{selected_asset} - {timeframe}",
-                          height=800 if num_subplots > 1 else 600,
-                          xaxis_rangeslider_visible=False,
-                          hovermode='x unified')
-
-        fig.update_xaxes(title_text="Date", row=num_subplots, col=1)
-        fig.update_yaxes(title_text="Price (USD)", row=1, col=1)
-
-        st.plotly_chart(fig, width='stretch')
+        df = data[selected_asset]
+
+        fig = build_price_chart(df,
+                                selected_asset,
+                                f"{selected_asset} - {timeframe} ({interval})",
+                                show_sma=show_sma,
+                                show_rsi=show_rsi,
+                                show_macd=show_macd,
+                                show_bb=show_bb,
+                                show_ibs=show_ibs)
+
+        render_chart(fig)
 
         col1, col2, col3, col4 = st.columns(4)
 
@@ -468,22 +373,42 @@ with tab4:
             st.cache_data.clear()
             st.rerun()
 
-    with st.spinner("Scraping latest market news..."):
-        news_content = scrape_financial_news()
+    snapshot = load_latest_snapshot()
+    precomputed = bool(snapshot and snapshot['news_text'] and snapshot['summary'])
+
+    # Every tab body runs on each rerun, so live scraping and the AI summary
+    # wait for an explicit request unless a batch snapshot already has them
+    if not precomputed and not st.session_state.get('news_requested'):
+        with col1:
+            if st.button("📰 Load News & AI Summary", use_container_width=True):
+                st.session_state['news_requested'] = True
+
+    if not precomputed and not st.session_state.get('news_requested'):
+        st.info("News is scraped and summarized on request. Click Load News & AI Summary to fetch the latest headlines.")
+    else:
+        if snapshot and snapshot['news_text']:
+            news_content = snapshot['news_text']
+        else:
+            with st.spinner("Scraping latest market news..."):
+                news_content = scrape_financial_news()
 
-    if news_content:
-        st.subheader("🤖 AI-Generated Market Summary")
+        if news_content:
+            st.subheader("🤖 AI-Generated Market Summary")
 
-        with st.spinner("Generating AI summary..."):
-            summary = generate_market_summary(news_content)
+            if precomputed:
+                summary = snapshot['summary']
+                st.caption(f"Precomputed at {snapshot['created_at']}")
+            else:
+                with st.spinner("Generating AI summary..."):
+                    summary = generate_market_summary(news_content)
 
-        st.markdown(summary)
+            st.markdown(summary)
 
-        with st.expander("📄 View Raw News Content"):
-            st.text_area("Scraped News", news_content, height=300)
-    else:
-        st.warning(
-            "Unable to fetch news at this time. Please try again later.")
+            with st.expander("📄 View Raw News Content"):
+                st.text_area("Scraped News", news_content, height=300)
+        else:
+            st.warning(
+                "Unable to fetch news at this time. Please try again later.")
 
 with tab5:
     st.header("🔍 Keyword Frequency Tracker")
@@ -508,7 +433,21 @@ with tab5:
             st.cache_data.clear()
             st.rerun()
 
-    if selected_keywords:
+    snapshot = load_latest_snapshot()
+    precomputed = bool(snapshot and selected_keywords and all(
+        kw in snapshot['keyword_counts'] for kw in selected_keywords))
+
+    # Counting keywords without snapshot counts means scraping the news
+    # sources, so it also waits for an explicit request
+    if (selected_keywords and not precomputed
+            and not st.session_state.get('keywords_requested')):
+        if st.button("🔍 Count Keywords in Latest News"):
+            st.session_state['keywords_requested'] = True
+
+    if (selected_keywords and not precomputed
+            and not st.session_state.get('keywords_requested')):
+        st.info("Keyword counts come from scraping current news sources. Click Count Keywords in Latest News to start.")
+    elif selected_keywords:
         with st.spinner("Analyzing keyword frequency..."):
             keyword_data, current_counts = track_keywords_frequency(
                 selected_keywords, days=30)
@@ -545,7 +484,7 @@ with tab5:
                                           xanchor="right",
                                           x=1))
 
-            st.plotly_chart(fig, width='stretch')
+            render_chart(fig)
 
             st.subheader("Current Keyword Statistics")
 
@@ -564,11 +503,140 @@ with tab5:
     else:
         st.info("Please select at least one keyword to track.")
 
+with tab6:
+    st.header("🔗 Rolling Correlations & Betas")
+    st.markdown(
+        "*Rolling correlation of daily log returns across all assets, and the beta of each cryptocurrency against the indices.*"
+    )
+
+    col1, col2 = st.columns([1, 2])
+
+    with col1:
+        corr_window = st.selectbox("Rolling Window (days)",
+                                   DEFAULT_WINDOWS,
+                                   index=1)
+
+    with st.spinner("Computing rolling correlations..."):
+        corr_data = get_correlation_data(
+            market.version, days=180,
+            windows=tuple(DEFAULT_WINDOWS)) if market else None
+
+    if corr_data and corr_window in corr_data['windows']:
+        window_data = corr_data['windows'][corr_window]
+        dates = window_data['dates']
+        names = list(corr_data['returns'].columns)
+
+        with col2:
+            date_labels = [d.strftime('%Y-%m-%d') for d in dates]
+            selected_date = st.select_slider("As Of",
+                                             options=date_labels,
+                                             value=date_labels[-1])
+
+        corr_matrix = window_data['corr'][date_labels.index(selected_date)]
+
+        fig = go.Figure(
+            go.Heatmap(z=corr_matrix,
+                       x=names,
+                       y=names,
+                       zmin=-1,
+                       zmax=1,
+                       colorscale='RdBu',
+                       reversescale=True,
+                       text=[[f"{v:.2f}" for v in row] for row in corr_matrix],
+                       texttemplate="%{text}"))
+
+        fig.update_layout(
+            title=f"{corr_window}-Day Correlation Matrix ({selected_date})",
+            height=500,
+            margin=dict(l=50, r=20, t=40, b=40))
+
+        render_chart(fig)
+
+        pair_stats = window_data['pairs']
+
+        if pair_stats is not None:
+            for stat, title in [('corr', 'Correlation'), ('beta', 'Beta')]:
+                fig = go.Figure()
+
+                for pair in pair_stats[stat].columns:
+                    fig.add_trace(
+                        go.Scatter(x=pair_stats[stat].index,
+                                   y=pair_stats[stat][pair],
+                                   mode='lines',
+                                   name=pair))
+
+                fig.update_layout(
+                    title=f"Rolling {corr_window}-Day {title} vs Indices",
+                    xaxis_title="Date",
+                    yaxis_title=title,
+                    hovermode='x unified',
+                    height=400,
+                    legend=dict(orientation="h",
+                                yanchor="bottom",
+                                y=1.02,
+                                xanchor="right",
+                                x=1))
+
+                render_chart(fig)
+    else:
+        st.error("Unable to compute correlations. Please try again later.")
+
+with tab7:
+    st.header("🚨 Indicator Screener")
+    st.markdown(
+        "*Scans every tracked asset on the latest bar for RSI extremes, SMA 20/50 crosses, Bollinger Band breaks and extreme Internal Bar Strength.*"
+    )
+
+    selected_rules = st.multiselect("Rules",
+                                    list(SCREENER_RULES.keys()),
+                                    default=list(SCREENER_RULES.keys()))
+
+    with st.spinner("Screening assets..."):
+        signals, rule_index = get_screener_signals(
+            market.version if market else 0, days=90)
+
+    hit_rules = [rule for rule in selected_rules if rule in rule_index]
+
+    if hit_rules:
+        for rule_name in hit_rules:
+            hits = get_rule_signals(signals, rule_index, rule_name)
+            st.subheader(f"{rule_name} ({len(hits)})")
+            st.dataframe(hits.drop(columns='rule'),
+                         hide_index=True,
+                         width='stretch')
+    else:
+        st.info("No assets currently match the selected rules.")
+
 st.markdown("---")
 st.caption(
     "💡 Data sources: Yahoo Finance, CoinGecko, Financial News Sites | Refresh intervals: Market data (5 min), News (1 hour), Keywords (24 hours)"
 )
 
+if show_perf_panel:
+    with st.sidebar:
+        st.markdown("### ⏱️ Performance")
+        st.caption("Since process start, across all sessions")
+
+        stage_stats = get_stage_stats()
+        if not stage_stats.empty:
+            st.markdown("**Stage Timings**")
+            st.dataframe(stage_stats.round(1), hide_index=True)
+
+        cache_stats = get_cache_stats()
+        if not cache_stats.empty:
+            st.markdown("**Cache Hits**")
+            st.dataframe(cache_stats.round(2), hide_index=True)
+
+        upstream_stats = get_upstream_stats()
+        if not upstream_stats.empty:
+            st.markdown("**Upstream Errors**")
+            st.dataframe(upstream_stats.round(3), hide_index=True)
+
+        with st.expander("Prometheus Metrics"):
+            st.code(render_prometheus(), language="text")
+
+write_metrics_file()
+
 if auto_refresh:
     import time
     time.sleep(300)
@@ -0,0 +1,286 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from charts import build_price_chart
+from data_fetcher import resample_market_chart
+from market_providers import ReplayProvider, replay_universe
+from technical_indicators import (calculate_internal_bar_strength,
+                                  add_all_indicators)
+from web_scraper import count_keywords, get_market_keywords
+
+BAR_SIZES = [1_000, 100_000, 1_000_000]
+ASSET_COUNTS = [5, 50, 500]
+ASSET_BARS = 365
+
+# Modules timed in a fresh interpreter each, and the heavy dependencies that
+# should only load on first use of their subsystem
+IMPORT_MODULES = [
+    'data_fetcher', 'technical_indicators', 'web_scraper', 'openai_helper',
+    'charts', 'correlation', 'screener', 'snapshot_store'
+]
+DEFERRED_MODULES = ['yfinance', 'pycoingecko', 'trafilatura', 'openai', 'ta', 'bs4']
+IMPORT_BUDGET_MS = 1500
+
+NEWS_VOCABULARY = [
+    'stocks', 'market', 'shares', 'investors', 'traders', 'index', 'bond',
+    'yields', 'dollar', 'oil', 'futures', 'quarter', 'guidance', 'growth',
+    'outlook', 'analysts', 'central', 'bank', 'policy', 'prices'
+]
+
+def make_news_fixture(words, seed=0):
+    rng = np.random.default_rng(seed)
+    vocabulary = NEWS_VOCABULARY + get_market_keywords()
+    text = ' '.join(rng.choice(vocabulary, size=words))
+    # Split into article-sized documents like the scraper returns
+    chunk = 5000
+    return [text[i:i + chunk] for i in range(0, len(text), chunk)]
+
+
+def make_ohlcv_fixture(provider, symbol, days, interval='1d'):
+    df = provider.history(symbol, period=f'{days}d', interval=interval)
+    df.columns = df.columns.str.lower()
+    return df
+
+
+def measure(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    # Memory is profiled on a separate run so tracing doesn't skew timings
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'seconds_min': min(timings),
+        'seconds_median': statistics.median(timings),
+        'peak_mb': peak / 1024**2,
+        'repeat': repeat
+    }
+
+
+def bar_stages(bars):
+    # A fixed bar count per series; minute bars keep a million of them within
+    # the timestamp range pandas supports
+    provider = ReplayProvider(bars=bars, seed=0, end='2025-01-01')
+    df = make_ohlcv_fixture(provider, 'BENCH', 1, interval='1m')
+    chart = provider.market_chart('bench-coin', days=30)
+    news = make_news_fixture(bars)
+    keywords = get_market_keywords()
+    with_indicators = add_all_indicators(df)
+    fig = build_price_chart(with_indicators, 'BENCH', 'Benchmark', True, True,
+                            True, True)
+
+    return {
+        'crypto_resample': lambda: resample_market_chart(chart, '1d'),
+        'add_all_indicators': lambda: add_all_indicators(df),
+        'internal_bar_strength': lambda: calculate_internal_bar_strength(df),
+        'keyword_counting': lambda: count_keywords(news, keywords),
+        'figure_build': lambda: build_price_chart(
+            with_indicators, 'BENCH', 'Benchmark', True, True, True, True),
+        'figure_serialize': lambda: fig.to_json()
+    }
+
+
+def universe_stages(assets):
+    provider = ReplayProvider(seed=0, end='2025-01-01')
+    universe = replay_universe(assets)
+    frames = [
+        make_ohlcv_fixture(provider, symbol, ASSET_BARS)
+        for symbol in universe.values()
+    ]
+
+    def indicators_all():
+        for df in frames:
+            add_all_indicators(df)
+
+    def ibs_all():
+        for df in frames:
+            calculate_internal_bar_strength(df)
+
+    def figures_all():
+        for name, df in zip(universe, frames):
+            build_price_chart(df, name, name).to_json()
+
+    return {
+        'add_all_indicators': indicators_all,
+        'internal_bar_strength': ibs_all,
+        'figure_build_serialize': figures_all
+    }
+
+
+def run_benchmarks(bar_sizes=BAR_SIZES, asset_counts=ASSET_COUNTS, repeat=3):
+    results = []
+
+    for bars in bar_sizes:
+        for stage, func in bar_stages(bars).items():
+            result = measure(func, repeat)
+            result.update({'stage': stage, 'bars': bars, 'assets': 1})
+            results.append(result)
+            print(f"{stage:<24} bars={bars:<9} "
+                  f"{result['seconds_median'] * 1000:10.2f} ms "
+                  f"{result['peak_mb']:9.1f} MB")
+
+    for assets in asset_counts:
+        for stage, func in universe_stages(assets).items():
+            result = measure(func, repeat)
+            result.update({'stage': stage, 'bars': ASSET_BARS, 'assets': assets})
+            results.append(result)
+            print(f"{stage:<24} assets={assets:<7} "
+                  f"{result['seconds_median'] * 1000:10.2f} ms "
+                  f"{result['peak_mb']:9.1f} MB")
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform()
+        },
+        'results': results
+    }
+
+
+def measure_import_time(module):
+    # -X importtime writes "self [us] | cumulative [us] | name" to stderr
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                           f'import {module}'],
+                          capture_output=True,
+                          text=True,
+                          cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, total, name = line[len('import time:'):].split('|')
+        if total.strip().isdigit():
+            cumulative[name.strip()] = int(total) / 1000
+
+    heaviest = sorted(((name, ms) for name, ms in cumulative.items()
+                       if '.' not in name and name != module),
+                      key=lambda item: item[1],
+                      reverse=True)[:5]
+
+    return {
+        'module': module,
+        'ok': proc.returncode == 0,
+        'import_ms': cumulative.get(module),
+        'heaviest': [{'module': name, 'ms': ms} for name, ms in heaviest],
+        'deferred_loaded': [m for m in DEFERRED_MODULES if m in cumulative]
+    }
+
+
+def run_import_report(modules=IMPORT_MODULES, budget_ms=IMPORT_BUDGET_MS):
+    results = []
+    for module in modules:
+        result = measure_import_time(module)
+        # A failed import still logs the time spent before the error, so the
+        # return code decides, not whether a time was reported
+        result['over_budget'] = (not result['ok']
+                                 or result['import_ms'] is None
+                                 or result['import_ms'] > budget_ms)
+        results.append(result)
+        import_ms = (f"{result['import_ms']:10.1f} ms"
+                     if result['ok'] and result['import_ms'] is not None
+                     else "    failed")
+        print(f"import {module:<22} {import_ms}"
+              f"{'  OVER BUDGET' if result['over_budget'] and result['ok'] else ''}"
+              f"{'  eager: ' + ', '.join(result['deferred_loaded']) if result['deferred_loaded'] else ''}")
+
+    return results
+
+
+def _result_key(result):
+    return (result['stage'], result['bars'], result['assets'])
+
+
+def find_regressions(report, baseline, tolerance):
+    previous = {_result_key(r): r for r in baseline['results']}
+    regressions = []
+
+    for result in report['results']:
+        old = previous.get(_result_key(result))
+        if old is None:
+            continue
+        limit = old['seconds_median'] * (1 + tolerance)
+        if result['seconds_median'] > limit:
+            regressions.append({
+                'stage': result['stage'],
+                'bars': result['bars'],
+                'assets': result['assets'],
+                'baseline_seconds': old['seconds_median'],
+                'seconds': result['seconds_median']
+            })
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Offline benchmark of the fetch -> indicators -> figure pipeline")
+    parser.add_argument('--bars', type=int, nargs='+', default=BAR_SIZES)
+    parser.add_argument('--assets', type=int, nargs='+', default=ASSET_COUNTS)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default='bench_output.json')
+    parser.add_argument('--baseline',
+                        help="previous JSON report to compare against")
+    parser.add_argument('--tolerance',
+                        type=float,
+                        default=0.2,
+                        help="allowed slowdown vs baseline (0.2 = 20%%)")
+    parser.add_argument('--imports',
+                        action='store_true',
+                        help="only report per-module import times")
+    parser.add_argument('--import-budget-ms',
+                        type=float,
+                        default=IMPORT_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    if args.imports:
+        imports = run_import_report(budget_ms=args.import_budget_ms)
+        with open(args.output, 'w') as f:
+            json.dump({'imports': imports}, f, indent=2)
+        print(f"Wrote {args.output}")
+        return 1 if any(r['over_budget'] or r['deferred_loaded']
+                        for r in imports) else 0
+
+    report = run_benchmarks(args.bars, args.assets, args.repeat)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report['regressions'] = find_regressions(report, baseline,
+                                                 args.tolerance)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+    for regression in report.get('regressions', []):
+        print(f"REGRESSION {regression['stage']} bars={regression['bars']} "
+              f"assets={regression['assets']}: "
+              f"{regression['baseline_seconds'] * 1000:.2f} ms -> "
+              f"{regression['seconds'] * 1000:.2f} ms")
+
+    return 1 if report.get('regressions') else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+
+def build_price_chart(df,
+                      name,
+                      title,
+                      show_sma=True,
+                      show_rsi=False,
+                      show_macd=False,
+                      show_bb=False,
+                      show_ibs=False):
+    show_ibs = show_ibs and 'IBS' in df.columns
+
+    num_subplots = 1
+    if show_rsi:
+        num_subplots += 1
+    if show_macd:
+        num_subplots += 1
+    if show_ibs:
+        num_subplots += 1
+
+    subplot_titles = ["Price"]
+    if show_rsi:
+        subplot_titles.append("RSI")
+    if show_macd:
+        subplot_titles.append("MACD")
+    if show_ibs:
+        subplot_titles.append("IBS")
+
+    row_heights = [0.6] + [0.2] * (num_subplots -
+                                   1) if num_subplots > 1 else [1.0]
+
+    fig = make_subplots(rows=num_subplots,
+                        cols=1,
+                        shared_xaxes=True,
+                        vertical_spacing=0.05,
+                        subplot_titles=subplot_titles,
+                        row_heights=row_heights)
+
+    fig.add_trace(go.Candlestick(x=df.index,
+                                 open=df['open'],
+                                 high=df['high'],
+                                 low=df['low'],
+                                 close=df['close'],
+                                 name=name),
+                  row=1,
+                  col=1)
+
+    if show_sma:
+        if 'SMA_20' in df.columns:
+            fig.add_trace(go.Scatter(x=df.index,
+                                     y=df['SMA_20'],
+                                     mode='lines',
+                                     name='SMA 20',
+                                     line=dict(color='orange', width=1)),
+                          row=1,
+                          col=1)
+        if 'SMA_50' in df.columns:
+            fig.add_trace(go.Scatter(x=df.index,
+                                     y=df['SMA_50'],
+                                     mode='lines',
+                                     name='SMA 50',
+                                     line=dict(color='blue', width=1)),
+                          row=1,
+                          col=1)
+
+    if show_bb:
+        if all(col in df.columns
+               for col in ['BB_High', 'BB_Mid', 'BB_Low']):
+            fig.add_trace(go.Scatter(x=df.index,
+                                     y=df['BB_High'],
+                                     mode='lines',
+                                     name='BB Upper',
+                                     line=dict(color='gray',
+                                               width=1,
+                                               dash='dash')),
+                          row=1,
+                          col=1)
+            fig.add_trace(go.Scatter(x=df.index,
+                                     y=df['BB_Mid'],
+                                     mode='lines',
+                                     name='BB Mid',
+                                     line=dict(color='gray', width=1)),
+                          row=1,
+                          col=1)
+            fig.add_trace(go.Scatter(x=df.index,
+                                     y=df['BB_Low'],
+                                     mode='lines',
+                                     name='BB Lower',
+                                     line=dict(color='gray',
+                                               width=1,
+                                               dash='dash')),
+                          row=1,
+                          col=1)
+
+    current_row = 2
+
+    if show_rsi and 'RSI' in df.columns:
+        fig.add_trace(go.Scatter(x=df.index,
+                                 y=df['RSI'],
+                                 mode='lines',
+                                 name='RSI',
+                                 line=dict(color='purple', width=2)),
+                      row=current_row,
+                      col=1)
+        fig.add_hline(y=70,
+                      line_dash="dash",
+                      line_color="red",
+                      opacity=0.5,
+                      row=current_row,
+                      col=1)
+        fig.add_hline(y=30,
+                      line_dash="dash",
+                      line_color="green",
+                      opacity=0.5,
+                      row=current_row,
+                      col=1)
+        current_row += 1
+
+    if show_macd and all(col in df.columns
+                         for col in ['MACD', 'MACD_Signal']):
+        fig.add_trace(go.Scatter(x=df.index,
+                                 y=df['MACD'],
+                                 mode='lines',
+                                 name='MACD',
+                                 line=dict(color='blue', width=2)),
+                      row=current_row,
+                      col=1)
+        fig.add_trace(go.Scatter(x=df.index,
+                                 y=df['MACD_Signal'],
+                                 mode='lines',
+                                 name='Signal',
+                                 line=dict(color='red', width=2)),
+                      row=current_row,
+                      col=1)
+        if 'MACD_Diff' in df.columns:
+            fig.add_trace(go.Bar(x=df.index,
+                                 y=df['MACD_Diff'],
+                                 name='Histogram',
+                                 marker_color='gray'),
+                          row=current_row,
+                          col=1)
+        current_row += 1
+
+    if show_ibs:
+        fig.add_trace(go.Bar(x=df.index,
+                             y=df['IBS'],
+                             name='IBS',
+                             marker_color=[
+                                 'green' if v >= 0 else 'red'
+                                 for v in df['IBS'].fillna(0)
+                             ]),
+                      row=current_row,
+                      col=1)
+        for level in (40, -40):
+            fig.add_hline(y=level,
+                          line_dash="dash",
+                          line_color="gray",
+                          opacity=0.5,
+                          row=current_row,
+                          col=1)
+
+    fig.update_layout(title=title,
+                      height=800 if num_subplots > 1 else 600,
+                      xaxis_rangeslider_visible=False,
+                      hovermode='x unified')
+
+    fig.update_xaxes(title_text="Date", row=num_subplots, col=1)
+    fig.update_yaxes(title_text="Price (USD)", row=1, col=1)
+
+    return fig
@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data_fetcher import STOCK_TICKERS, CRYPTO_IDS
+from market_snapshot import get_snapshot_version, SNAPSHOT_HISTORY
+from perf_monitor import traced_cache
+
+DEFAULT_WINDOWS = [10, 20, 60]
+
+
+def get_returns_matrix(all_data):
+    if not all_data:
+        return None
+
+    closes = {}
+    for name, df in all_data.items():
+        if df is None or df.empty or 'close' not in df.columns:
+            continue
+
+        close = df['close'].copy()
+        if getattr(close.index, 'tz', None) is not None:
+            close.index = close.index.tz_localize(None)
+        close.index = close.index.normalize()
+        closes[name] = close[~close.index.duplicated(keep='last')]
+
+    if len(closes) < 2:
+        return None
+
+    # Crypto trades on weekends, indices don't: keep only the common sessions
+    prices = pd.DataFrame(closes).dropna()
+    returns = np.log(prices).diff().dropna()
+
+    return returns
+
+
+def _window_sums(values, window):
+    # Running sums: each window total is one subtraction of two prefix sums
+    padded = np.concatenate([np.zeros((1, ) + values.shape[1:]), values])
+    cumulative = np.cumsum(padded, axis=0)
+    return cumulative[window:] - cumulative[:-window]
+
+
+def rolling_pair_stats(returns, pairs, window):
+    if returns is None or len(returns) < window or not pairs:
+        return None
+
+    names = list(returns.columns)
+    left = [names.index(a) for a, _ in pairs]
+    right = [names.index(b) for _, b in pairs]
+
+    x = returns.to_numpy(dtype=np.float64)
+    a = x[:, left]
+    b = x[:, right]
+
+    sum_a = _window_sums(a, window)
+    sum_b = _window_sums(b, window)
+    sum_aa = _window_sums(a * a, window)
+    sum_bb = _window_sums(b * b, window)
+    sum_ab = _window_sums(a * b, window)
+
+    cov = (sum_ab - sum_a * sum_b / window) / (window - 1)
+    var_a = (sum_aa - sum_a * sum_a / window) / (window - 1)
+    var_b = (sum_bb - sum_b * sum_b / window) / (window - 1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = cov / np.sqrt(var_a * var_b)
+        beta = cov / var_b
+
+    index = returns.index[window - 1:]
+    columns = [f"{a} / {b}" for a, b in pairs]
+
+    return {
+        'cov': pd.DataFrame(cov, index=index, columns=columns),
+        'corr': pd.DataFrame(np.clip(corr, -1.0, 1.0),
+                             index=index,
+                             columns=columns),
+        'beta': pd.DataFrame(beta, index=index, columns=columns)
+    }
+
+
+def rolling_correlation_matrices(returns, window):
+    if returns is None or len(returns) < window:
+        return None, None, None
+
+    x = returns.to_numpy(dtype=np.float64)
+    steps, n = x.shape
+
+    running_sum = np.zeros(n)
+    running_outer = np.zeros((n, n))
+    cov = np.empty((steps - window + 1, n, n), dtype=np.float32)
+    corr = np.empty((steps - window + 1, n, n), dtype=np.float32)
+
+    # Add the newest row and drop the oldest one: O(n^2) per step whatever
+    # the window length
+    for t in range(steps):
+        running_sum += x[t]
+        running_outer += np.outer(x[t], x[t])
+
+        if t >= window:
+            running_sum -= x[t - window]
+            running_outer -= np.outer(x[t - window], x[t - window])
+
+        if t >= window - 1:
+            c = (running_outer -
+                 np.outer(running_sum, running_sum) / window) / (window - 1)
+            std = np.sqrt(np.clip(np.diag(c), 0.0, None))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                r = c / np.outer(std, std)
+            cov[t - window + 1] = c
+            corr[t - window + 1] = np.clip(r, -1.0, 1.0)
+
+    return returns.index[window - 1:], cov, corr
+
+
+def get_beta_pairs(returns):
+    if returns is None:
+        return []
+
+    available = set(returns.columns)
+    return [(crypto, index) for crypto in CRYPTO_IDS
+            for index in STOCK_TICKERS
+            if crypto in available and index in available]
+
+
+# A resource cache: the correlation cubes are shared read-only between
+# sessions instead of being unpickled into a fresh copy on every rerun
+@traced_cache('compute.correlation',
+              cache=st.cache_resource,
+              max_entries=SNAPSHOT_HISTORY)
+def _compute_correlation_data(version, days, windows):
+    # Keyed on the snapshot version, so it is computed once per data refresh.
+    # A missing version raises, and exceptions are never cached.
+    snapshot = get_snapshot_version(version)
+    if snapshot is None:
+        raise LookupError(f"Market snapshot {version} is no longer available")
+
+    returns = get_returns_matrix(snapshot.window(days))
+
+    if returns is None:
+        return None
+
+    pairs = get_beta_pairs(returns)
+    results = {'returns': returns, 'windows': {}}
+
+    for window in windows:
+        dates, cov, corr = rolling_correlation_matrices(returns, window)
+        if dates is None:
+            continue
+
+        results['windows'][window] = {
+            'dates': dates,
+            'cov': cov,
+            'corr': corr,
+            'pairs': rolling_pair_stats(returns, pairs, window)
+        }
+
+    return results
+
+
+def get_correlation_data(version, days=180, windows=tuple(DEFAULT_WINDOWS)):
+    try:
+        return _compute_correlation_data(version, days, tuple(windows))
+    except LookupError:
+        return None
@@ -1,10 +1,11 @@
-import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
-from pycoingecko import CoinGeckoAPI
 import streamlit as st
 
-cg = CoinGeckoAPI()
+from market_providers import get_market_provider, get_provider_key
+from perf_monitor import traced_cache, record_error
+from snapshot_store import get_snapshot_assets
+from upstream_client import get_upstream_client, UpstreamError
 
 STOCK_TICKERS = {
     'S&P 500': '^GSPC',
@@ -17,11 +18,84 @@ CRYPTO_IDS = {
     'Ethereum': 'ethereum'
 }
 
-@st.cache_data(ttl=300)
-def get_stock_data(ticker, period='1mo', interval='1d'):
+# yfinance only serves intraday bars for a limited lookback and caps the span
+# of a single request, so longer ranges are stitched from several chunks.
+# max_bars bounds how much history is retained per asset in memory.
+INTERVALS = {
+    '1m': {'rule': '1min', 'lookback_days': 30, 'chunk_days': 7, 'max_bars': 20000},
+    '5m': {'rule': '5min', 'lookback_days': 60, 'chunk_days': 30, 'max_bars': 20000},
+    '15m': {'rule': '15min', 'lookback_days': 60, 'chunk_days': 60, 'max_bars': 10000},
+    '1h': {'rule': '1h', 'lookback_days': 730, 'chunk_days': 365, 'max_bars': 10000},
+    '1d': {'rule': '1D', 'lookback_days': None, 'chunk_days': None, 'max_bars': None}
+}
+
+LOOKBACK_MARGIN = timedelta(hours=1)
+
+# CoinGecko's market chart has at best hourly prices for multi-day spans, so
+# an intraday bar would hold a single price (open = high = low = close).
+# Crypto is only built as daily bars from those hourly points.
+CRYPTO_INTERVALS = ['1d']
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+def is_intraday(interval):
+    return interval != '1d'
+
+def clamp_days(days, interval):
+    lookback = INTERVALS[interval]['lookback_days']
+    return min(days, lookback) if lookback else days
+
+def compact_ohlcv(df, interval='1d'):
+    if df is None or df.empty:
+        return df
+    
+    df = df[OHLCV_COLUMNS].astype('float32')
+    
+    max_bars = INTERVALS[interval]['max_bars']
+    if max_bars and len(df) > max_bars:
+        df = df.iloc[-max_bars:]
+    
+    return df
+
+def _fetch_stock_chunks(client, provider, ticker, days, interval):
+    chunk_days = INTERVALS[interval]['chunk_days']
+    lookback_days = INTERVALS[interval]['lookback_days']
+    end = datetime.now()
+    # Yahoo rejects a start exactly at the lookback limit, so stay inside it
+    start = max(end - timedelta(days=days),
+                end - timedelta(days=lookback_days) + LOOKBACK_MARGIN)
+    
+    frames = []
+    chunk_start = start
+    while chunk_start < end:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days), end)
+        chunk = client.call(provider.history, ticker, start=chunk_start, end=chunk_end,
+                            interval=interval, allow_empty=True)
+        if chunk is not None and not chunk.empty:
+            frames.append(chunk)
+        chunk_start = chunk_end
+    
+    if not frames:
+        return None
+    
+    df = pd.concat(frames)
+    return df[~df.index.duplicated(keep='last')].sort_index()
+
+def get_stock_data(ticker, period='1mo', interval='1d', days=None):
+    return _get_stock_data(get_provider_key('stock'), ticker, period, interval, days)
+
+@traced_cache('fetch.stock', ttl=300)
+def _get_stock_data(source, ticker, period, interval, days):
+    # source only keys the cache on the active provider
+    provider = get_market_provider('stock')
+    client = get_upstream_client(provider.name)
+    key = (source, ticker, period, interval, days)
+    
     try:
-        stock = yf.Ticker(ticker)
-        df = stock.history(period=period, interval=interval)
+        if is_intraday(interval) and days is not None:
+            df = _fetch_stock_chunks(client, provider, ticker, clamp_days(days, interval), interval)
+        else:
+            df = client.call(provider.history, ticker, period=period, interval=interval)
         
         if df is not None and not df.empty:
             df.columns = df.columns.str.lower()
@@ -30,58 +104,107 @@ def get_stock_data(ticker, period='1mo', interval='1d'):
             if not all(col in df.columns for col in required_cols):
                 st.error(f"Missing required columns for {ticker}")
                 return None
+            
+            df = compact_ohlcv(df, interval)
+            client.remember(key, df)
         
         return df
+    except UpstreamError as e:
+        record_error('fetch.stock')
+        try:
+            df = client.serve_stale(key, e)
+            st.warning(f"Showing last available data for {ticker}: {e}")
+            return df
+        except UpstreamError:
+            st.error(f"Error fetching stock data for {ticker}: {e}")
+            return None
     except Exception as e:
+        record_error('fetch.stock')
         st.error(f"Error fetching stock data for {ticker}: {e}")
         return None
 
-@st.cache_data(ttl=300)
-def get_crypto_data(crypto_id, days=30):
+def resample_market_chart(data, interval='1d'):
+    if interval not in CRYPTO_INTERVALS:
+        raise ValueError(f"Crypto bars are not available at {interval}")
+    
+    prices = data['prices']
+    volumes = data['total_volumes']
+    
+    df = pd.DataFrame(prices, columns=['timestamp', 'price'])
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    df.set_index('timestamp', inplace=True)
+    
+    volume_df = pd.DataFrame(volumes, columns=['timestamp', 'volume'])
+    volume_df['timestamp'] = pd.to_datetime(volume_df['timestamp'], unit='ms')
+    volume_df.set_index('timestamp', inplace=True)
+    
+    df['volume'] = volume_df['volume']
+    
+    rule = INTERVALS[interval]['rule']
+    price = df['price'].resample(rule)
+    
+    bars_df = pd.DataFrame()
+    bars_df['open'] = price.first()
+    bars_df['high'] = price.max()
+    bars_df['low'] = price.min()
+    bars_df['close'] = price.last()
+    bars_df['volume'] = df['volume'].resample(rule).sum()
+    
+    return compact_ohlcv(bars_df.dropna(), interval)
+
+def get_crypto_data(crypto_id, days=30, interval='1d'):
+    return _get_crypto_data(get_provider_key('crypto'), crypto_id, days, interval)
+
+@traced_cache('fetch.crypto', ttl=300)
+def _get_crypto_data(source, crypto_id, days, interval):
+    # source only keys the cache on the active provider
+    provider = get_market_provider('crypto')
+    client = get_upstream_client(provider.name)
+    key = (source, crypto_id, days, interval)
+    
     try:
-        data = cg.get_coin_market_chart_by_id(
-            id=crypto_id,
-            vs_currency='usd',
-            days=days
-        )
+        data = client.call(provider.market_chart, crypto_id, days)
+        bars_df = resample_market_chart(data, interval)
+        client.remember(key, bars_df)
         
-        prices = data['prices']
-        volumes = data['total_volumes']
-        
-        df = pd.DataFrame(prices, columns=['timestamp', 'price'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df.set_index('timestamp', inplace=True)
-        
-        volume_df = pd.DataFrame(volumes, columns=['timestamp', 'volume'])
-        volume_df['timestamp'] = pd.to_datetime(volume_df['timestamp'], unit='ms')
-        volume_df.set_index('timestamp', inplace=True)
-        
-        df['volume'] = volume_df['volume']
-        
-        daily_df = pd.DataFrame()
-        daily_df['open'] = df['price'].resample('1D').first()
-        daily_df['high'] = df['price'].resample('1D').max()
-        daily_df['low'] = df['price'].resample('1D').min()
-        daily_df['close'] = df['price'].resample('1D').last()
-        daily_df['volume'] = df['volume'].resample('1D').sum()
-        
-        daily_df = daily_df.dropna()
-        
-        return daily_df
+        return bars_df
+    except UpstreamError as e:
+        record_error('fetch.crypto')
+        try:
+            bars_df = client.serve_stale(key, e)
+            st.warning(f"Showing last available data for {crypto_id}: {e}")
+            return bars_df
+        except UpstreamError:
+            st.error(f"Error fetching crypto data for {crypto_id}: {e}")
+            return None
     except Exception as e:
+        record_error('fetch.crypto')
         st.error(f"Error fetching crypto data for {crypto_id}: {e}")
         return None
 
-def get_all_assets_data(days=30):
+def get_all_assets_data(days=30, interval='1d', stock_tickers=None, crypto_ids=None,
+                        use_snapshot=True):
+    days = clamp_days(days, interval)
+    
+    if use_snapshot and stock_tickers is None and crypto_ids is None:
+        all_data = get_snapshot_assets(days, interval)
+        if all_data:
+            return all_data
+    
     all_data = {}
+    stock_tickers = STOCK_TICKERS if stock_tickers is None else stock_tickers
+    crypto_ids = CRYPTO_IDS if crypto_ids is None else crypto_ids
     
-    for name, ticker in STOCK_TICKERS.items():
-        df = get_stock_data(ticker, period=f'{days}d', interval='1d')
+    for name, ticker in stock_tickers.items():
+        df = get_stock_data(ticker, period=f'{days}d', interval=interval, days=days)
         if df is not None and not df.empty:
             all_data[name] = df
     
-    for name, crypto_id in CRYPTO_IDS.items():
-        df = get_crypto_data(crypto_id, days=days)
+    if interval not in CRYPTO_INTERVALS:
+        crypto_ids = {}
+    
+    for name, crypto_id in crypto_ids.items():
+        df = get_crypto_data(crypto_id, days=days, interval=interval)
         if df is not None and not df.empty:
             all_data[name] = df
     
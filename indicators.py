@@ -1,9 +1,9 @@
 import pandas as pd
 import numpy as np
-from ta.trend import SMAIndicator, EMAIndicator, MACD
-from ta.momentum import RSIIndicator
-from ta.volatility import BollingerBands
 
+from perf_monitor import trace
+
+@trace('indicators.ibs')
 def calculate_internal_bar_strength(df):
     if df is None or df.empty:
         return None
@@ -27,6 +27,8 @@ def add_moving_averages(df, periods=[20, 50]):
     if df is None or df.empty:
         return df
     
+    from ta.trend import SMAIndicator
+    
     df = df.copy()
     
     for period in periods:
@@ -40,6 +42,8 @@ def add_rsi(df, window=14):
     if df is None or df.empty or len(df) < window:
         return df
     
+    from ta.momentum import RSIIndicator
+    
     df = df.copy()
     
     rsi = RSIIndicator(close=df['close'], window=window)
@@ -51,6 +55,8 @@ def add_macd(df):
     if df is None or df.empty or len(df) < 26:
         return df
     
+    from ta.trend import MACD
+    
     df = df.copy()
     
     macd = MACD(close=df['close'])
@@ -64,6 +70,8 @@ def add_bollinger_bands(df, window=20):
     if df is None or df.empty or len(df) < window:
         return df
     
+    from ta.volatility import BollingerBands
+    
     df = df.copy()
     
     bb = BollingerBands(close=df['close'], window=window)
@@ -73,6 +81,7 @@ def add_bollinger_bands(df, window=20):
     
     return df
 
+@trace('indicators.all')
 def add_all_indicators(df, indicators=['SMA', 'RSI', 'MACD', 'BB']):
     if df is None or df.empty:
         return df
@@ -1,6 +1,105 @@
-def main():
-    print("Hello from repl-nix-workspace!")
+import argparse
+import sys
+import time
+
+from data_fetcher import get_all_assets_data, clamp_days, INTERVALS
+from market_snapshot import SNAPSHOT_TIERS
+from openai_helper import generate_market_summary, is_api_key_configured
+from snapshot_store import write_snapshot, SNAPSHOT_DIR
+from technical_indicators import (calculate_internal_bar_strength,
+                                  add_all_indicators)
+from web_scraper import (scrape_financial_news, get_current_keyword_counts,
+                         get_market_keywords)
+
+
+def build_snapshot(days=365,
+                   interval='1d',
+                   summarize=False,
+                   keywords=True,
+                   output_dir=SNAPSHOT_DIR,
+                   keep=10):
+    start = time.perf_counter()
+
+    # The same lookback tiers the dashboard builds, up to --days, so short
+    # windows are served from frames fetched at that span's granularity
+    tier_days = sorted({clamp_days(t, interval)
+                        for t in SNAPSHOT_TIERS if t < days}
+                       | {clamp_days(days, interval)})
+
+    tiers = {}
+    for tier in tier_days:
+        all_data = get_all_assets_data(days=tier,
+                                       interval=interval,
+                                       use_snapshot=False)
+        if all_data:
+            tiers[tier] = all_data
+    if not tiers:
+        print("No market data fetched; snapshot not written")
+        return None
+    print(f"Fetched {len(tiers)} tiers in {time.perf_counter() - start:.1f}s")
+
+    for frames in tiers.values():
+        for name, df in frames.items():
+            df = add_all_indicators(df)
+            ibs = calculate_internal_bar_strength(df)
+            if ibs is not None:
+                df['IBS'] = ibs
+            frames[name] = df
+    print(f"Computed indicators in {time.perf_counter() - start:.1f}s")
+
+    keyword_counts = None
+    if keywords:
+        keyword_counts = get_current_keyword_counts(get_market_keywords())
+        print(f"Counted keywords in {time.perf_counter() - start:.1f}s")
+
+    news_text = None
+    summary = None
+    if summarize:
+        news_text = scrape_financial_news()
+        if news_text and is_api_key_configured():
+            summary = generate_market_summary(news_text)
+        print(f"Scraped news and summarised in {time.perf_counter() - start:.1f}s")
+
+    version = write_snapshot(tiers,
+                             interval,
+                             keyword_counts=keyword_counts,
+                             news_text=news_text,
+                             summary=summary,
+                             root=output_dir,
+                             keep=keep)
+    print(f"Wrote snapshot {version} to {output_dir} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    return version
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Precompute a dashboard snapshot without Streamlit")
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--interval', choices=list(INTERVALS), default='1d')
+    parser.add_argument('--summarize',
+                        action='store_true',
+                        help="scrape news and generate the AI summary")
+    parser.add_argument('--no-keywords',
+                        action='store_true',
+                        help="skip keyword counting")
+    parser.add_argument('--output-dir', default=SNAPSHOT_DIR)
+    parser.add_argument('--keep',
+                        type=int,
+                        default=10,
+                        help="number of snapshot versions to retain")
+    args = parser.parse_args(argv)
+
+    version = build_snapshot(days=args.days,
+                             interval=args.interval,
+                             summarize=args.summarize,
+                             keywords=not args.no_keywords,
+                             output_dir=args.output_dir,
+                             keep=args.keep)
+
+    return 0 if version is not None else 1
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
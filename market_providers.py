@@ -0,0 +1,251 @@
+import os
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# 'live' uses yfinance and CoinGecko; 'replay' serves recorded or synthetic
+# bars so the pipeline can run and be load-tested without network access
+MARKET_DATA_PROVIDER = os.environ.get("MARKET_DATA_PROVIDER", "live")
+REPLAY_FIXTURE_DIR = os.environ.get("REPLAY_FIXTURE_DIR")
+REPLAY_LATENCY_MS = float(os.environ.get("REPLAY_LATENCY_MS", "0"))
+REPLAY_BARS = int(os.environ.get("REPLAY_BARS", "0")) or None
+REPLAY_SEED = int(os.environ.get("REPLAY_SEED", "0"))
+
+REPLAY_FREQUENCIES = {
+    '1m': '1min',
+    '5m': '5min',
+    '15m': '15min',
+    '1h': '1h',
+    '1d': '1D'
+}
+
+# Synthetic bars are laid out from a fixed epoch in blocks of this many bars
+REPLAY_EPOCH = pd.Timestamp('1970-01-01')
+REPLAY_BLOCK = 1024
+
+BARS_PER_DAY = {'1m': 1440, '5m': 288, '15m': 96, '1h': 24, '1d': 1}
+
+# How yfinance reports a range with no price data when raise_errors is set
+YFINANCE_NO_DATA_MESSAGES = ['no data found', 'no price data found']
+
+_provider_override = None
+_provider_generation = 0
+
+
+def _is_no_data_error(error):
+    message = str(error).lower()
+    return (type(error).__name__ == 'YFPricesMissingError'
+            or any(text in message for text in YFINANCE_NO_DATA_MESSAGES))
+
+
+class YFinanceProvider:
+    name = 'yfinance'
+
+    def history(self,
+                ticker,
+                period=None,
+                interval='1d',
+                start=None,
+                end=None,
+                allow_empty=False):
+        import yfinance as yf
+
+        # By default yfinance logs failures and returns an empty frame, which
+        # would bypass the retries, breaker and stale data in UpstreamClient
+        stock = yf.Ticker(ticker)
+        try:
+            if start is not None:
+                return stock.history(start=start,
+                                     end=end,
+                                     interval=interval,
+                                     raise_errors=True)
+            return stock.history(period=period,
+                                 interval=interval,
+                                 raise_errors=True)
+        except Exception as e:
+            # A range with no sessions (weekend, holiday, before the open) is
+            # an empty chunk, not a failed request
+            if allow_empty and _is_no_data_error(e):
+                return pd.DataFrame()
+            raise
+
+
+class CoinGeckoProvider:
+    name = 'coingecko'
+
+    def __init__(self):
+        from pycoingecko import CoinGeckoAPI
+
+        self.client = CoinGeckoAPI()
+
+    def market_chart(self, crypto_id, days):
+        return self.client.get_coin_market_chart_by_id(id=crypto_id,
+                                                       vs_currency='usd',
+                                                       days=days)
+
+
+class ReplayProvider:
+    name = 'replay'
+
+    def __init__(self,
+                 fixture_dir=None,
+                 latency_ms=0.0,
+                 bars=None,
+                 seed=0,
+                 end=None):
+        self.fixture_dir = fixture_dir
+        self.latency = latency_ms / 1000.0
+        self.bars = bars
+        self.seed = seed
+        self.end = pd.Timestamp(end) if end is not None else None
+        self.fixtures = {}
+
+    def _sleep(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _load_fixture(self, symbol):
+        if not self.fixture_dir:
+            return None
+
+        if symbol not in self.fixtures:
+            path = os.path.join(self.fixture_dir, f"{_fixture_name(symbol)}.csv")
+            self.fixtures[symbol] = (pd.read_csv(
+                path, index_col=0, parse_dates=True)
+                                     if os.path.exists(path) else None)
+
+        return self.fixtures[symbol]
+
+    def _synthetic(self, symbol, n, freq, end):
+        # Each bar is a function of its timestamp, so chunked or overlapping
+        # requests slice one continuous series: seeded levels every
+        # REPLAY_BLOCK bars, joined by seeded Brownian bridges
+        step = pd.Timedelta(freq)
+        last = (end - REPLAY_EPOCH) // step
+        first = last - n + 1
+        blocks = range((first - 1) // REPLAY_BLOCK, last // REPLAY_BLOCK + 1)
+        seed = [zlib.crc32(symbol.encode()), self.seed, int(step.total_seconds())]
+
+        levels = [
+            np.random.default_rng(seed + [k, 0]).normal(0.0, 0.3)
+            for k in range(blocks[0], blocks[-1] + 2)
+        ]
+        frac = np.arange(REPLAY_BLOCK) / REPLAY_BLOCK
+
+        log_close, spread, volume = [], [], []
+        for i, k in enumerate(blocks):
+            rng = np.random.default_rng(seed + [k, 1])
+            steps = rng.normal(0.0, 0.01, REPLAY_BLOCK)
+            walk = np.concatenate([[0.0], np.cumsum(steps[:-1])])
+            log_close.append(levels[i] + frac * (levels[i + 1] - levels[i]) +
+                             walk - frac * steps.sum())
+            spread.append(np.abs(rng.normal(0.0, 0.005, (2, REPLAY_BLOCK))))
+            volume.append(rng.lognormal(15.0, 0.5, REPLAY_BLOCK))
+
+        # One extra bar before the range so every open is the prior close
+        offset = first - 1 - blocks[0] * REPLAY_BLOCK
+        prices = 100.0 * np.exp(
+            np.concatenate(log_close)[offset:offset + n + 1])
+        open_, close = prices[:-1], prices[1:]
+        spread = np.concatenate(spread, axis=1)[:, offset + 1:offset + n + 1]
+        volume = np.concatenate(volume)[offset + 1:offset + n + 1]
+        high = np.maximum(open_, close) * (1 + spread[0])
+        low = np.minimum(open_, close) * (1 - spread[1])
+        index = REPLAY_EPOCH + step * np.arange(first, last + 1)
+
+        return pd.DataFrame(
+            {
+                'Open': open_,
+                'High': high,
+                'Low': low,
+                'Close': close,
+                'Volume': volume
+            },
+            index=pd.DatetimeIndex(index))
+
+    def _bars(self, symbol, interval, days=None, start=None, end=None):
+        end = pd.Timestamp(end) if end is not None else (
+            self.end or pd.Timestamp.now())
+        if start is not None:
+            days = max((end - pd.Timestamp(start)).total_seconds() / 86400, 1)
+
+        n = self.bars or max(int(days * BARS_PER_DAY[interval]), 2)
+
+        df = self._load_fixture(symbol)
+        if df is not None:
+            df = df.rename(columns=str.title)
+            if start is not None:
+                return df.loc[pd.Timestamp(start):end]
+            return df.iloc[-n:]
+
+        return self._synthetic(symbol, n, REPLAY_FREQUENCIES[interval], end)
+
+    def history(self,
+                ticker,
+                period=None,
+                interval='1d',
+                start=None,
+                end=None,
+                allow_empty=False):
+        self._sleep()
+        days = int(period.rstrip('d')) if period and period.endswith('d') else 30
+        return self._bars(ticker, interval, days=days, start=start, end=end)
+
+    def market_chart(self, crypto_id, days):
+        self._sleep()
+        # CoinGecko returns hourly points for spans up to 90 days
+        df = self._bars(crypto_id, '1h' if days <= 90 else '1d', days=days)
+        timestamps = df.index.as_unit('ms').asi8.tolist()
+
+        return {
+            'prices': [[t, p] for t, p in zip(timestamps, df['Close'])],
+            'total_volumes': [[t, v] for t, v in zip(timestamps, df['Volume'])]
+        }
+
+
+def _fixture_name(symbol):
+    return symbol.replace('^', '').replace('/', '_')
+
+
+def save_fixture(df, symbol, fixture_dir):
+    os.makedirs(fixture_dir, exist_ok=True)
+    path = os.path.join(fixture_dir, f"{_fixture_name(symbol)}.csv")
+    df.to_csv(path)
+    return path
+
+
+def replay_universe(n, prefix='SYN'):
+    return {f"{prefix} {i:04d}": f"{prefix}{i:04d}" for i in range(n)}
+
+
+def set_market_provider(provider):
+    global _provider_override, _provider_generation
+    _provider_override = provider
+    _provider_generation += 1
+
+
+@st.cache_resource
+def _get_default_provider(kind, source):
+    if source == 'replay':
+        return ReplayProvider(fixture_dir=REPLAY_FIXTURE_DIR,
+                              latency_ms=REPLAY_LATENCY_MS,
+                              bars=REPLAY_BARS,
+                              seed=REPLAY_SEED)
+    if kind == 'crypto':
+        return CoinGeckoProvider()
+    return YFinanceProvider()
+
+
+def get_market_provider(kind):
+    if _provider_override is not None:
+        return _provider_override
+    return _get_default_provider(kind, MARKET_DATA_PROVIDER)
+
+
+def get_provider_key(kind):
+    # Part of every fetch cache key, so swapping providers never serves frames
+    # cached from the previous one
+    return get_market_provider(kind).name, _provider_generation
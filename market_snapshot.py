@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+
+import streamlit as st
+
+from data_fetcher import get_all_assets_data, clamp_days
+from snapshot_store import tail_days
+from technical_indicators import (calculate_internal_bar_strength,
+                                  add_all_indicators)
+
+# Lookbacks fetched together on every refresh. CoinGecko only returns hourly
+# prices (and so real daily ranges) for spans up to 90 days, so the short
+# tier serves every window that fits in it and the long tier the rest.
+SNAPSHOT_TIERS = [90, 365]
+SNAPSHOT_REFRESH_SECONDS = 300
+# Older versions kept so caches keyed on a version can still resolve it
+SNAPSHOT_HISTORY = 3
+
+
+class MarketSnapshot:
+
+    def __init__(self, version, interval, tiers):
+        self.version = version
+        self.interval = interval
+        self.tiers = tiers
+        self.created_at = datetime.now()
+        self.built = time.monotonic()
+
+    @property
+    def age(self):
+        return time.monotonic() - self.built
+
+    def window(self, days):
+        # Smallest tier that covers the window, so every tab slices the same
+        # fetch instead of requesting its own
+        available = sorted(self.tiers)
+        tier = next((t for t in available if t >= days), available[-1])
+
+        return {
+            name: tail_days(df, days)
+            for name, df in self.tiers[tier].items()
+        }
+
+
+def build_tier(days, interval):
+    frames = {}
+    for name, df in get_all_assets_data(days=days, interval=interval).items():
+        if 'IBS' not in df.columns:
+            df = add_all_indicators(df)
+            ibs = calculate_internal_bar_strength(df)
+            if ibs is not None:
+                df['IBS'] = ibs
+        frames[name] = df
+
+    return frames
+
+
+class SnapshotRegistry:
+
+    def __init__(self, history=SNAPSHOT_HISTORY):
+        self.history = history
+        self.next_version = 1
+        self.current = {}
+        # History is kept per interval, so intraday builds never evict the
+        # daily snapshot the other tabs are keyed on
+        self.versions = defaultdict(OrderedDict)
+        self.build_locks = defaultdict(threading.Lock)
+        self.lock = threading.Lock()
+
+    def _fresh(self, snapshot, max_age, since=None):
+        if snapshot is None:
+            return False
+        if since is not None:
+            return snapshot.built >= since
+        return snapshot.age < max_age
+
+    def get(self, interval='1d', max_age=SNAPSHOT_REFRESH_SECONDS, force=False):
+        requested = time.monotonic() if force else None
+
+        snapshot = self.current.get(interval)
+        if self._fresh(snapshot, max_age, requested):
+            return snapshot
+
+        with self.lock:
+            build_lock = self.build_locks[interval]
+
+        # One build per interval at a time: sessions waiting on a 1h rebuild
+        # don't hold up ones reading the daily snapshot
+        with build_lock:
+            snapshot = self.current.get(interval)
+            if self._fresh(snapshot, max_age, requested):
+                return snapshot
+
+            tiers = {}
+            for days in sorted({clamp_days(t, interval) for t in SNAPSHOT_TIERS}):
+                frames = build_tier(days, interval)
+                if frames:
+                    tiers[days] = frames
+
+            if not tiers:
+                return snapshot
+
+            with self.lock:
+                snapshot = MarketSnapshot(self.next_version, interval, tiers)
+                self.next_version += 1
+                versions = self.versions[interval]
+                versions[snapshot.version] = snapshot
+                while len(versions) > self.history:
+                    versions.popitem(last=False)
+                self.current[interval] = snapshot
+
+            return snapshot
+
+    def by_version(self, version):
+        with self.lock:
+            for versions in self.versions.values():
+                if version in versions:
+                    return versions[version]
+            return None
+
+
+@st.cache_resource
+def get_snapshot_registry():
+    return SnapshotRegistry()
+
+
+def get_market_snapshot(interval='1d', force=False):
+    return get_snapshot_registry().get(interval, force=force)
+
+
+def get_snapshot_version(version):
+    return get_snapshot_registry().by_version(version)
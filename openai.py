@@ -1,8 +1,9 @@
 # Using python_openai blueprint integration
 import os
-from openai import OpenAI
 import streamlit as st
 
+from perf_monitor import traced_cache, record_error
+
 # the newest OpenAI model is "gpt-5" which was released August 7, 2025.
 # do not change this unless explicitly requested by the user
 
@@ -11,9 +12,11 @@ OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 def get_openai_client():
     if not OPENAI_API_KEY:
         return None
+    # The SDK is only needed once a summary is actually generated
+    from openai import OpenAI
     return OpenAI(api_key=OPENAI_API_KEY)
 
-@st.cache_data(ttl=1800, show_spinner=False)
+@traced_cache('summary.openai', ttl=1800, show_spinner=False)
 def generate_market_summary(news_text):
     client = get_openai_client()
     
@@ -43,6 +46,7 @@ News content:
         return response.choices[0].message.content
     
     except Exception as e:
+        record_error('summary.openai')
         return f"Error generating summary: {str(e)}"
 
 def is_api_key_configured():
@@ -0,0 +1,237 @@
+import functools
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Optional path for a Prometheus textfile-collector style metrics dump
+PERF_METRICS_FILE = os.environ.get("PERF_METRICS_FILE")
+
+# Recent samples kept per stage for percentiles; totals are kept forever
+SAMPLE_WINDOW = 500
+
+_lock = threading.Lock()
+_stages = defaultdict(lambda: {
+    'count': 0,
+    'errors': 0,
+    'total': 0.0,
+    'max': 0.0,
+    'payload_bytes': 0,
+    'samples': deque(maxlen=SAMPLE_WINDOW)
+})
+_cache = defaultdict(lambda: {'calls': 0, 'misses': 0})
+_upstream = defaultdict(lambda: {'requests': 0, 'errors': 0})
+_calls = threading.local()
+
+
+def record_timing(stage, seconds, error=False):
+    with _lock:
+        stats = _stages[stage]
+        stats['count'] += 1
+        stats['total'] += seconds
+        stats['max'] = max(stats['max'], seconds)
+        stats['samples'].append(seconds)
+        if error:
+            stats['errors'] += 1
+
+
+def record_error(stage):
+    with _lock:
+        _stages[stage]['errors'] += 1
+
+
+def record_payload(stage, result):
+    if isinstance(result, pd.DataFrame):
+        size = int(result.memory_usage(deep=False).sum())
+    elif isinstance(result, str):
+        size = len(result.encode())
+    else:
+        return
+
+    with _lock:
+        _stages[stage]['payload_bytes'] += size
+
+
+def record_upstream(provider, error=False):
+    with _lock:
+        _upstream[provider]['requests'] += 1
+        if error:
+            _upstream[provider]['errors'] += 1
+
+
+@contextmanager
+def stage_timer(stage):
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        record_timing(stage, time.perf_counter() - start, error)
+
+
+def trace(stage):
+
+    def decorator(func):
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def traced_cache(stage, cache=st.cache_data, **cache_kwargs):
+    # Streamlit's caches hide whether a call was served from cache, so count
+    # every call outside it and only the real executions inside it. Misses are
+    # timed under the stage and hits under "<stage>.hit", so cheap hits don't
+    # mask upstream latency.
+
+    def decorator(func):
+
+        @functools.wraps(func)
+        def compute(*args, **kwargs):
+            _calls.stack[-1].append(True)
+            with _lock:
+                _cache[stage]['misses'] += 1
+            with stage_timer(stage):
+                result = func(*args, **kwargs)
+            record_payload(stage, result)
+            return result
+
+        cached = cache(**cache_kwargs)(compute)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _lock:
+                _cache[stage]['calls'] += 1
+
+            # One marker per call, so a nested cached call can't flag ours
+            if not hasattr(_calls, 'stack'):
+                _calls.stack = []
+            missed = []
+            _calls.stack.append(missed)
+            start = time.perf_counter()
+            try:
+                result = cached(*args, **kwargs)
+            finally:
+                _calls.stack.pop()
+
+            if not missed:
+                record_timing(f"{stage}.hit", time.perf_counter() - start)
+            return result
+
+        wrapper.clear = cached.clear
+        return wrapper
+
+    return decorator
+
+
+def get_stage_stats():
+    with _lock:
+        rows = []
+        for stage, stats in sorted(_stages.items()):
+            samples = np.array(stats['samples']) * 1000
+            rows.append({
+                'stage': stage,
+                'calls': stats['count'],
+                'errors': stats['errors'],
+                'mean_ms': stats['total'] / stats['count'] * 1000
+                if stats['count'] else 0.0,
+                'p95_ms': float(np.percentile(samples, 95))
+                if len(samples) else 0.0,
+                'max_ms': stats['max'] * 1000,
+                'payload_kb': stats['payload_bytes'] / 1024
+            })
+
+    return pd.DataFrame(rows)
+
+
+def get_cache_stats():
+    with _lock:
+        rows = [{
+            'function': stage,
+            'calls': stats['calls'],
+            'hits': stats['calls'] - stats['misses'],
+            'misses': stats['misses'],
+            'hit_rate': (stats['calls'] - stats['misses']) / stats['calls']
+            if stats['calls'] else 0.0
+        } for stage, stats in sorted(_cache.items())]
+
+    return pd.DataFrame(rows)
+
+
+def get_upstream_stats():
+    with _lock:
+        rows = [{
+            'provider': provider,
+            'requests': stats['requests'],
+            'errors': stats['errors'],
+            'error_rate': stats['errors'] / stats['requests']
+            if stats['requests'] else 0.0
+        } for provider, stats in sorted(_upstream.items())]
+
+    return pd.DataFrame(rows)
+
+
+def render_prometheus():
+    with _lock:
+        stages = {stage: dict(stats) for stage, stats in _stages.items()}
+        cache = {stage: dict(stats) for stage, stats in _cache.items()}
+        upstream = {name: dict(stats) for name, stats in _upstream.items()}
+
+    families = [
+        ('dashboard_stage_seconds_total', 'counter', 'stage', stages, 'total'),
+        ('dashboard_stage_calls_total', 'counter', 'stage', stages, 'count'),
+        ('dashboard_stage_errors_total', 'counter', 'stage', stages, 'errors'),
+        ('dashboard_stage_seconds_max', 'gauge', 'stage', stages, 'max'),
+        ('dashboard_stage_payload_bytes_total', 'counter', 'stage', stages,
+         'payload_bytes'),
+        ('dashboard_cache_calls_total', 'counter', 'function', cache, 'calls'),
+        ('dashboard_cache_misses_total', 'counter', 'function', cache,
+         'misses'),
+        ('dashboard_upstream_requests_total', 'counter', 'provider', upstream,
+         'requests'),
+        ('dashboard_upstream_errors_total', 'counter', 'provider', upstream,
+         'errors')
+    ]
+
+    lines = []
+    for metric, metric_type, label, source, field in families:
+        lines.append(f'# TYPE {metric} {metric_type}')
+        for name, stats in sorted(source.items()):
+            lines.append(f'{metric}{{{label}="{name}"}} {stats[field]}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def write_metrics_file(path=PERF_METRICS_FILE):
+    if not path:
+        return
+
+    # Write then rename so a scraper never reads a half-written file. Every
+    # session writes at the end of its rerun, so each gets its own temp file.
+    with tempfile.NamedTemporaryFile('w',
+                                     dir=os.path.dirname(path) or '.',
+                                     prefix=f".{os.path.basename(path)}.",
+                                     delete=False) as f:
+        f.write(render_prometheus())
+    # Temp files are created owner-only; the collector may run as another user
+    os.chmod(f.name, 0o644)
+    os.replace(f.name, path)
+
+
+def render_chart(fig):
+    with stage_timer('render.chart'):
+        st.plotly_chart(fig, width='stretch')
@@ -0,0 +1,195 @@
+import numpy as np
+import pandas as pd
+
+from market_snapshot import get_snapshot_version, SNAPSHOT_HISTORY
+from perf_monitor import traced_cache
+from technical_indicators import (calculate_internal_bar_strength,
+                                  add_all_indicators)
+
+SCREENER_RULES = {
+    'RSI Overbought': {
+        'type': 'above',
+        'column': 'RSI',
+        'threshold': 70
+    },
+    'RSI Oversold': {
+        'type': 'below',
+        'column': 'RSI',
+        'threshold': 30
+    },
+    'SMA 20/50 Golden Cross': {
+        'type': 'cross_above',
+        'column': 'SMA_20',
+        'other': 'SMA_50'
+    },
+    'SMA 20/50 Death Cross': {
+        'type': 'cross_below',
+        'column': 'SMA_20',
+        'other': 'SMA_50'
+    },
+    'Close Above Upper BB': {
+        'type': 'above',
+        'column': 'close',
+        'other': 'BB_High'
+    },
+    'Close Below Lower BB': {
+        'type': 'below',
+        'column': 'close',
+        'other': 'BB_Low'
+    },
+    'Extreme IBS Strength': {
+        'type': 'above',
+        'column': 'IBS',
+        'threshold': 40
+    },
+    'Extreme IBS Weakness': {
+        'type': 'below',
+        'column': 'IBS',
+        'threshold': -40
+    }
+}
+
+SIGNAL_COLUMNS = ['rule', 'asset', 'date', 'value', 'reference', 'strength']
+
+
+def build_screener_frames(all_data):
+    latest = {}
+    previous = {}
+    dates = {}
+
+    for name, df in all_data.items():
+        if df is None or len(df) < 2:
+            continue
+
+        if 'IBS' not in df.columns:
+            df = add_all_indicators(df)
+            ibs = calculate_internal_bar_strength(df)
+            if ibs is not None:
+                df['IBS'] = ibs
+
+        latest[name] = df.iloc[-1]
+        previous[name] = df.iloc[-2]
+        dates[name] = df.index[-1]
+
+    latest = pd.DataFrame(latest).T
+    previous = pd.DataFrame(previous).T
+
+    return latest, previous, pd.Series(dates, dtype=object)
+
+
+def _rule_operands(frame, rule):
+    if rule['column'] not in frame.columns:
+        return None, None
+
+    value = frame[rule['column']].astype(float)
+
+    if 'other' in rule:
+        if rule['other'] not in frame.columns:
+            return None, None
+        reference = frame[rule['other']].astype(float)
+    else:
+        reference = pd.Series(float(rule['threshold']), index=frame.index)
+
+    return value, reference
+
+
+def evaluate_rule(rule, latest, previous):
+    value, reference = _rule_operands(latest, rule)
+    if value is None:
+        return None
+
+    spread = value - reference
+
+    if rule['type'] == 'above':
+        hits = spread > 0
+    elif rule['type'] == 'below':
+        hits = spread < 0
+    elif rule['type'] in ('cross_above', 'cross_below'):
+        prev_value, prev_reference = _rule_operands(previous, rule)
+        prev_spread = prev_value - prev_reference
+        if rule['type'] == 'cross_above':
+            hits = (prev_spread <= 0) & (spread > 0)
+        else:
+            hits = (prev_spread >= 0) & (spread < 0)
+    else:
+        raise ValueError(f"Unknown screener rule type: {rule['type']}")
+
+    hits = hits.fillna(False)
+
+    return pd.DataFrame({
+        'asset': value.index[hits],
+        'value': value[hits].values,
+        'reference': reference[hits].values,
+        'strength': spread[hits].abs().values
+    })
+
+
+def screen_universe(all_data, rules=None):
+    rules = rules if rules is not None else SCREENER_RULES
+
+    empty = pd.DataFrame(columns=SIGNAL_COLUMNS)
+    if not all_data:
+        return empty, {}
+
+    latest, previous, dates = build_screener_frames(all_data)
+    if latest.empty:
+        return empty, {}
+
+    frames = []
+    for rule_name, rule in rules.items():
+        hits = evaluate_rule(rule, latest, previous)
+        if hits is None or hits.empty:
+            continue
+        hits.insert(0, 'rule', rule_name)
+        hits.insert(2, 'date', dates[hits['asset']].values)
+        frames.append(hits)
+
+    if not frames:
+        return empty, {}
+
+    # Sorted by rule then strongest hit first, so each rule is a contiguous
+    # slice that the index below points straight at
+    rule_order = {name: i for i, name in enumerate(rules)}
+    signals = pd.concat(frames, ignore_index=True)
+    signals['rule_order'] = signals['rule'].map(rule_order)
+    signals = signals.sort_values(['rule_order', 'strength'],
+                                  ascending=[True, False],
+                                  kind='mergesort')
+    signals = signals.drop(columns='rule_order').reset_index(drop=True)
+
+    rule_values = signals['rule'].to_numpy()
+    boundaries = np.flatnonzero(rule_values[1:] != rule_values[:-1]) + 1
+    starts = np.concatenate([[0], boundaries])
+    stops = np.concatenate([boundaries, [len(signals)]])
+    rule_index = {
+        rule_values[start]: (int(start), int(stop))
+        for start, stop in zip(starts, stops)
+    }
+
+    return signals, rule_index
+
+
+def get_rule_signals(signals, rule_index, rule_name):
+    if rule_name not in rule_index:
+        return signals.iloc[0:0]
+
+    start, stop = rule_index[rule_name]
+    return signals.iloc[start:stop]
+
+
+@traced_cache('compute.screener', max_entries=SNAPSHOT_HISTORY)
+def _compute_screener_signals(version, days):
+    # Snapshot frames already carry indicators and IBS for this version. A
+    # missing version raises, and exceptions are never cached.
+    snapshot = get_snapshot_version(version)
+    if snapshot is None:
+        raise LookupError(f"Market snapshot {version} is no longer available")
+
+    return screen_universe(snapshot.window(days))
+
+
+def get_screener_signals(version, days=90):
+    try:
+        return _compute_screener_signals(version, days)
+    except LookupError:
+        return screen_universe({})
@@ -0,0 +1,151 @@
+import json
+import os
+import re
+import shutil
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+# Precomputed snapshots written by `python main.py`; the dashboard reads the
+# latest one instead of fetching when it is recent enough
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", "snapshots")
+SNAPSHOT_MAX_AGE_MINUTES = float(os.environ.get("SNAPSHOT_MAX_AGE_MINUTES", "60"))
+LATEST_FILE = "LATEST"
+META_FILE = "snapshot.json"
+
+
+def _asset_file(name):
+    return re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_') + '.parquet'
+
+
+def _tier_dir(days):
+    return f"{days}d"
+
+
+def _version_dir(version, root=SNAPSHOT_DIR):
+    return os.path.join(root, f"{version:06d}")
+
+
+def list_versions(root=SNAPSHOT_DIR):
+    if not os.path.isdir(root):
+        return []
+    return sorted(int(d) for d in os.listdir(root) if d.isdigit())
+
+
+def get_latest_version(root=SNAPSHOT_DIR):
+    try:
+        with open(os.path.join(root, LATEST_FILE)) as f:
+            return int(f.read().strip())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def write_snapshot(tiers,
+                   interval,
+                   keyword_counts=None,
+                   news_text=None,
+                   summary=None,
+                   root=SNAPSHOT_DIR,
+                   keep=10):
+    versions = list_versions(root)
+    version = versions[-1] + 1 if versions else 1
+
+    # Build in a temporary directory and rename, so readers never see a
+    # partially written version
+    tmp_dir = os.path.join(root, f".tmp-{version:06d}")
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    # One set of frames per lookback tier, as MarketSnapshot builds them
+    assets = {}
+    for days, frames in tiers.items():
+        os.makedirs(os.path.join(tmp_dir, _tier_dir(days)), exist_ok=True)
+        assets[str(days)] = {}
+        for name, df in frames.items():
+            filename = os.path.join(_tier_dir(days), _asset_file(name))
+            df.to_parquet(os.path.join(tmp_dir, filename))
+            assets[str(days)][name] = filename
+
+    meta = {
+        'version': version,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'interval': interval,
+        'tiers': assets,
+        'keyword_counts': keyword_counts or {},
+        'news_text': news_text,
+        'summary': summary
+    }
+    with open(os.path.join(tmp_dir, META_FILE), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    os.replace(tmp_dir, _version_dir(version, root))
+
+    latest_tmp = os.path.join(root, f"{LATEST_FILE}.tmp")
+    with open(latest_tmp, 'w') as f:
+        f.write(str(version))
+    os.replace(latest_tmp, os.path.join(root, LATEST_FILE))
+
+    for old in versions[:max(len(versions) + 1 - keep, 0)]:
+        shutil.rmtree(_version_dir(old, root), ignore_errors=True)
+
+    return version
+
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def load_snapshot(version, root=SNAPSHOT_DIR):
+    # Versions are immutable once written, so no TTL is needed; only the
+    # latest and the one it replaced are kept in memory
+    path = _version_dir(version, root)
+    with open(os.path.join(path, META_FILE)) as f:
+        meta = json.load(f)
+
+    meta['frames'] = {
+        int(days): {
+            name: pd.read_parquet(os.path.join(path, filename))
+            for name, filename in files.items()
+        }
+        for days, files in meta['tiers'].items()
+    }
+    return meta
+
+
+def load_latest_snapshot(max_age_minutes=SNAPSHOT_MAX_AGE_MINUTES,
+                         root=SNAPSHOT_DIR):
+    version = get_latest_version(root)
+    if version is None:
+        return None
+
+    try:
+        snapshot = load_snapshot(version, root)
+    except Exception as e:
+        print(f"Error loading snapshot {version}: {e}")
+        return None
+
+    age = datetime.now() - datetime.fromisoformat(snapshot['created_at'])
+    if age.total_seconds() > max_age_minutes * 60:
+        return None
+
+    return snapshot
+
+
+def get_snapshot_assets(days, interval='1d'):
+    snapshot = load_latest_snapshot()
+    if snapshot is None or snapshot['interval'] != interval:
+        return None
+
+    # Smallest tier that covers the window: CoinGecko only has hourly prices
+    # (real daily ranges) up to 90 days, so short windows never come from a
+    # longer tier's single daily price
+    covering = [tier for tier in sorted(snapshot['frames']) if tier >= days]
+    if not covering:
+        return None
+
+    return {
+        name: tail_days(df, days)
+        for name, df in snapshot['frames'][covering[0]].items() if not df.empty
+    }
+
+
+def tail_days(df, days):
+    cutoff = df.index[-1] - pd.Timedelta(days=days)
+    return df[df.index > cutoff]
@@ -0,0 +1,195 @@
+import json
+import os
+import select
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# Extraction runs in worker processes started from this file as a script, so
+# a worker only loads the standard library and trafilatura; it never re-runs
+# the Streamlit or batch entry point the way multiprocessing's spawn does
+EXTRACT_WORKERS = int(
+    os.environ.get("EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+EXTRACT_TIMEOUT_SECONDS = float(os.environ.get("EXTRACT_TIMEOUT_SECONDS", "20"))
+FETCH_WORKERS = int(os.environ.get("FETCH_WORKERS", "8"))
+
+# Idle workers are shared by every session in the process, and at most
+# EXTRACT_WORKERS are alive at once
+_idle_workers = []
+_worker_count = 0
+_workers_changed = threading.Condition()
+
+
+def _acquire_worker():
+    global _worker_count
+    with _workers_changed:
+        while not _idle_workers and _worker_count >= EXTRACT_WORKERS:
+            _workers_changed.wait()
+        if _idle_workers:
+            return _idle_workers.pop()
+        _worker_count += 1
+
+    try:
+        return subprocess.Popen([sys.executable, os.path.abspath(__file__)],
+                                stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE)
+    except OSError:
+        with _workers_changed:
+            _worker_count -= 1
+            _workers_changed.notify()
+        raise
+
+
+def _release_worker(worker):
+    with _workers_changed:
+        _idle_workers.append(worker)
+        _workers_changed.notify()
+
+
+def _kill_worker(worker):
+    # Only this worker is killed; other sessions' extractions keep running
+    global _worker_count
+    worker.kill()
+    worker.wait()
+    with _workers_changed:
+        _worker_count -= 1
+        _workers_changed.notify()
+
+
+def _extract_in_worker(url, html, timeout):
+    worker = _acquire_worker()
+
+    # The clock starts once a worker is free, not while waiting for one
+    try:
+        worker.stdin.write(json.dumps({'url': url, 'html': html}).encode() + b'\n')
+        worker.stdin.flush()
+        ready, _, _ = select.select([worker.stdout], [], [], timeout)
+        line = worker.stdout.readline() if ready else None
+    except OSError as e:
+        _kill_worker(worker)
+        raise RuntimeError(f"worker failed: {e}")
+
+    if line is None:
+        _kill_worker(worker)
+        raise TimeoutError
+    if not line:
+        _kill_worker(worker)
+        raise RuntimeError("worker exited")
+
+    _release_worker(worker)
+    response = json.loads(line)
+    if 'error' in response:
+        raise RuntimeError(response['error'])
+    return response['document']
+
+
+def _record_error(message):
+    # Imported here: workers run this module and must stay light
+    from perf_monitor import record_error
+
+    record_error('scrape.documents')
+    print(message)
+
+
+def extract_document(url, html):
+    import trafilatura
+
+    result = trafilatura.extract(html,
+                                 url=url,
+                                 output_format='json',
+                                 with_metadata=True)
+    if not result:
+        return None
+
+    data = json.loads(result)
+    return {
+        'url': url,
+        'title': data.get('title'),
+        'date': data.get('date'),
+        'source': data.get('sitename') or data.get('hostname'),
+        'text': data.get('text') or ''
+    }
+
+
+def fetch_html(url):
+    import trafilatura
+
+    return trafilatura.fetch_url(url)
+
+
+def fetch_pages(urls, timeout=EXTRACT_TIMEOUT_SECONDS):
+    executor = ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(urls) or 1))
+    futures = {url: executor.submit(fetch_html, url) for url in urls}
+    wait(futures.values(), timeout=timeout)
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    pages = {}
+    for url, future in futures.items():
+        if not future.done():
+            _record_error(f"Timed out fetching {url}")
+            continue
+        try:
+            html = future.result()
+        except Exception as e:
+            _record_error(f"Error fetching {url}: {e}")
+            continue
+        if html:
+            pages[url] = html
+
+    return pages
+
+
+def extract_documents(pages, timeout=EXTRACT_TIMEOUT_SECONDS):
+    if not pages:
+        return []
+
+    executor = ThreadPoolExecutor(max_workers=min(EXTRACT_WORKERS, len(pages)))
+    futures = {
+        url: executor.submit(_extract_in_worker, url, html, timeout)
+        for url, html in pages.items()
+    }
+    executor.shutdown(wait=True)
+
+    documents = []
+    # Keep the caller's URL order
+    for url, future in futures.items():
+        try:
+            document = future.result()
+        except TimeoutError:
+            _record_error(f"Timed out extracting {url}")
+            continue
+        except Exception as e:
+            _record_error(f"Error extracting {url}: {e}")
+            continue
+        if document:
+            documents.append(document)
+
+    return documents
+
+
+def scrape_documents(urls, timeout=EXTRACT_TIMEOUT_SECONDS):
+    return extract_documents(fetch_pages(urls, timeout=timeout),
+                             timeout=timeout)
+
+
+def _serve():
+    # Worker loop: one JSON request per line on stdin, one response per line
+    # on stdout. Anything else printing goes to stderr instead.
+    out = sys.stdout.buffer
+    sys.stdout = sys.stderr
+
+    for line in sys.stdin.buffer:
+        request = json.loads(line)
+        try:
+            response = {
+                'document': extract_document(request['url'], request['html'])
+            }
+        except Exception as e:
+            response = {'error': str(e)}
+        out.write(json.dumps(response).encode() + b'\n')
+        out.flush()
+
+
+if __name__ == "__main__":
+    _serve()
@@ -0,0 +1,195 @@
+import random
+import threading
+import time
+
+import streamlit as st
+
+from perf_monitor import record_upstream
+
+# Requests per second, burst size and breaker settings per data provider.
+# CoinGecko's public API allows roughly 30 calls a minute.
+PROVIDER_LIMITS = {
+    'coingecko': {
+        'rate': 0.5,
+        'burst': 5,
+        'max_retries': 4,
+        'failure_threshold': 5,
+        'reset_timeout': 60
+    },
+    'yfinance': {
+        'rate': 2.0,
+        'burst': 5,
+        'max_retries': 3,
+        'failure_threshold': 5,
+        'reset_timeout': 30
+    },
+    'replay': {
+        'rate': 1e9,
+        'burst': 1e9,
+        'max_retries': 0,
+        'failure_threshold': 5,
+        'reset_timeout': 30
+    }
+}
+
+NON_RETRYABLE_STATUS = {400, 401, 403, 404}
+
+
+class UpstreamError(Exception):
+    pass
+
+
+class CircuitOpenError(UpstreamError):
+    pass
+
+
+class TokenBucket:
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, max_wait=30.0):
+        deadline = time.monotonic() + max_wait
+
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity,
+                                  self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+
+                wait = (1 - self.tokens) / self.rate
+
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self.lock:
+            if self.opened_at is None:
+                return 'closed'
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return 'half-open'
+            return 'open'
+
+    def allow(self):
+        # Half-open lets a single request through as a probe; its outcome
+        # closes the circuit or opens it again
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if (self.probing
+                    or time.monotonic() - self.opened_at < self.reset_timeout):
+                return False
+            self.probing = True
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.probing = False
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+def _is_retryable(error):
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None)
+    return status not in NON_RETRYABLE_STATUS
+
+
+class UpstreamClient:
+
+    def __init__(self,
+                 name,
+                 rate,
+                 burst,
+                 max_retries=3,
+                 base_delay=1.0,
+                 max_delay=30.0,
+                 failure_threshold=5,
+                 reset_timeout=60):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.last_good = {}
+        self.lock = threading.Lock()
+
+    def _backoff(self, attempt):
+        # Full jitter keeps concurrent sessions from retrying in lockstep
+        return random.uniform(0, min(self.max_delay,
+                                     self.base_delay * 2**attempt))
+
+    def remember(self, key, result):
+        with self.lock:
+            self.last_good[key] = result
+
+    def serve_stale(self, key, error):
+        with self.lock:
+            if key in self.last_good:
+                return self.last_good[key]
+        raise error
+
+    def call(self, func, *args, **kwargs):
+        if not self.breaker.allow():
+            raise CircuitOpenError(
+                f"{self.name} circuit open after repeated failures")
+
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if not self.bucket.acquire():
+                last_error = "rate limit wait exceeded"
+                break
+
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                last_error = e
+                record_upstream(self.name, error=True)
+                if not _is_retryable(e):
+                    break
+                if attempt < self.max_retries:
+                    time.sleep(self._backoff(attempt))
+                continue
+
+            record_upstream(self.name)
+            self.breaker.record_success()
+            return result
+
+        # One failure per request, however many attempts it took
+        self.breaker.record_failure()
+        raise UpstreamError(f"{self.name} request failed: {last_error}")
+
+
+@st.cache_resource
+def get_upstream_client(provider):
+    return UpstreamClient(provider, **PROVIDER_LIMITS[provider])
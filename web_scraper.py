@@ -1,22 +1,27 @@
 # Using web_scraper blueprint integration
-import trafilatura
-import requests
-from bs4 import BeautifulSoup
 import streamlit as st
 from datetime import datetime, timedelta
-import re
-from collections import Counter
 
-def get_website_text_content(url: str) -> str:
+from perf_monitor import trace, traced_cache, record_error
+from snapshot_store import load_latest_snapshot
+from text_extraction import scrape_documents
+
+@trace('scrape.documents')
+def get_news_documents(urls):
+    # Pages are fetched concurrently and extracted in a process pool with a
+    # per-document timeout, so one slow page can't stall the script thread
     try:
-        downloaded = trafilatura.fetch_url(url)
-        text = trafilatura.extract(downloaded)
-        return text if text else ""
+        return scrape_documents(urls)
     except Exception as e:
-        st.warning(f"Error scraping {url}: {e}")
-        return ""
+        record_error('scrape.documents')
+        st.warning(f"Error scraping news sources: {e}")
+        return []
+
+def get_website_text_content(url: str) -> str:
+    documents = get_news_documents([url])
+    return documents[0]['text'] if documents else ""
 
-@st.cache_data(ttl=3600)
+@traced_cache('scrape.news', ttl=3600)
 def scrape_financial_news():
     news_sources = [
         'https://finance.yahoo.com/topic/stock-market-news',
@@ -24,42 +29,43 @@ def scrape_financial_news():
         'https://www.cnbc.com/world/?region=world'
     ]
     
-    all_news = []
-    
-    for url in news_sources[:2]:
-        try:
-            text = get_website_text_content(url)
-            if text:
-                all_news.append(text)
-        except Exception as e:
-            continue
+    all_news = [doc['text'] for doc in get_news_documents(news_sources[:2]) if doc['text']]
     
     return "\n\n".join(all_news)
 
-@st.cache_data(ttl=3600)
-def track_keywords_frequency(keywords, days=30):
-    keyword_data = {kw: {} for kw in keywords}
+def count_keywords(texts, keywords):
+    current_counts = {}
+    for text in texts:
+        text_lower = text.lower()
+        
+        for keyword in keywords:
+            count = text_lower.count(keyword.lower())
+            if keyword not in current_counts:
+                current_counts[keyword] = 0
+            current_counts[keyword] += count
     
+    return current_counts
+
+def get_current_keyword_counts(keywords):
     news_sources = [
         'https://finance.yahoo.com/topic/stock-market-news',
         'https://www.marketwatch.com/latest-news',
         'https://www.cnbc.com/markets/'
     ]
     
-    current_counts = {}
-    for url in news_sources:
-        try:
-            text = get_website_text_content(url)
-            if text:
-                text_lower = text.lower()
-                
-                for keyword in keywords:
-                    count = text_lower.count(keyword.lower())
-                    if keyword not in current_counts:
-                        current_counts[keyword] = 0
-                    current_counts[keyword] += count
-        except Exception as e:
-            continue
+    texts = [doc['text'] for doc in get_news_documents(news_sources)]
+    
+    return count_keywords(texts, keywords)
+
+@traced_cache('scrape.keywords', ttl=3600)
+def track_keywords_frequency(keywords, days=30):
+    keyword_data = {kw: {} for kw in keywords}
+    
+    snapshot = load_latest_snapshot()
+    if snapshot and all(kw in snapshot['keyword_counts'] for kw in keywords):
+        current_counts = {kw: snapshot['keyword_counts'][kw] for kw in keywords}
+    else:
+        current_counts = get_current_keyword_counts(keywords)
     
     for keyword in keywords:
         current_count = current_counts.get(keyword, 5)